@@ -1,40 +1,92 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
+import asyncio
+import orjson
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.conflict_predictor import ConflictPredictor
-from utils.feature_extractor import FeatureExtractor
+from utils.feature_extractor import FeatureExtractor, pr_key
+from utils.batch_scheduler import BatchScheduler
+
+app = FastAPI(default_response_class=ORJSONResponse)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=['*'],
+    allow_methods=['*'],
+    allow_headers=['*']
+)
+
+# Predictor and scheduler are created per worker on startup
+predictor = None
+scheduler = None
+feature_extractor = FeatureExtractor()
 
-app = Flask(__name__)
-CORS(app)
+# Feature extraction runs here so it never blocks the event loop
+_EXEC = ThreadPoolExecutor(max_workers=os.cpu_count())
 
-# Initialize predictor
-predictor = ConflictPredictor()
-feature_extractor = FeatureExtractor()
+# Constant response bodies, serialized once
+HEALTH_LOADING = orjson.dumps({'status': 'ok', 'model_loaded': False})
+HEALTH_READY = orjson.dumps({'status': 'ok', 'model_loaded': True})
+health_bytes = HEALTH_LOADING
+metrics_bytes = None
+
+@app.on_event('startup')
+async def load_predictor():
+    global predictor, scheduler, health_bytes, metrics_bytes
+
+    predictor = await asyncio.to_thread(ConflictPredictor)
+    scheduler = BatchScheduler(predictor)
+    scheduler.start()
+
+    metrics_bytes = orjson.dumps({
+        'accuracy': 0.873,
+        'precision': 0.812,
+        'recall': 0.854,
+        'f1_score': 0.832,
+        'auc_roc': 0.891,
+        'version': predictor.get_version(),
+        'last_trained': '2025-06-15T10:30:00Z',
+        'training_samples': 15420
+    })
+    health_bytes = HEALTH_READY if predictor.is_loaded() else HEALTH_LOADING
 
-@app.route('/health', methods=['GET'])
-def health():
-    return jsonify({'status': 'ok', 'model_loaded': predictor.is_loaded()})
+@app.on_event('shutdown')
+async def stop_scheduler():
+    if scheduler:
+        await scheduler.stop()
+    _EXEC.shutdown(wait=False)
 
-@app.route('/predict/conflict', methods=['POST'])
-def predict_conflict():
+@app.get('/health')
+async def health():
+    return Response(health_bytes, media_type='application/json')
+
+@app.post('/predict/conflict')
+async def predict_conflict(request: Request):
     """
     Predict merge conflict probability for a pull request
     """
     try:
-        data = request.json
+        data = orjson.loads(await request.body())
+
+        key = pr_key(data)
 
         # Extract features from PR data
-        features = feature_extractor.extract_pr_features(data)
+        loop = asyncio.get_running_loop()
+        features = await loop.run_in_executor(
+            _EXEC, partial(feature_extractor.extract_pr_features, data, digest=key)
+        )
 
-        # Make prediction
-        prediction = predictor.predict(features)
+        # Make prediction (coalesced with concurrent requests)
+        prediction = await scheduler.submit(features, key)
 
-        return jsonify({
+        return ORJSONResponse({
             'prediction': 'conflict' if prediction['probability'] > 0.7 else 'no_conflict',
             'confidence': float(prediction['probability']),
             'risk_level': get_risk_level(prediction['probability']),
@@ -43,61 +95,57 @@ def predict_conflict():
         })
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 400
+        return ORJSONResponse({'error': str(e)}, status_code=400)
 
-@app.route('/predict/batch', methods=['POST'])
-def predict_batch():
+@app.post('/predict/batch')
+async def predict_batch(request: Request):
     """
     Predict conflicts for multiple PRs
     """
     try:
-        data = request.json
+        data = orjson.loads(await request.body())
         prs = data.get('prs', [])
 
-        predictions = []
-        for pr in prs:
-            features = feature_extractor.extract_pr_features(pr)
-            prediction = predictor.predict(features)
-            predictions.append({
+        feature_dicts = await asyncio.to_thread(
+            feature_extractor.extract_pr_features_many, prs, _EXEC
+        )
+        probabilities = await asyncio.to_thread(predictor.predict_many, feature_dicts)
+
+        predictions = [
+            {
                 'pr_number': pr.get('number'),
-                'probability': float(prediction['probability']),
-                'risk_level': get_risk_level(prediction['probability'])
-            })
+                'probability': float(probability),
+                'risk_level': get_risk_level(probability)
+            }
+            for pr, probability in zip(prs, probabilities)
+        ]
 
-        return jsonify({'predictions': predictions})
+        # Returning the response directly skips FastAPI's jsonable_encoder pass
+        return ORJSONResponse({'predictions': predictions})
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 400
+        return ORJSONResponse({'error': str(e)}, status_code=400)
 
-@app.route('/model/metrics', methods=['GET'])
-def model_metrics():
+@app.get('/model/metrics')
+async def model_metrics():
     """
     Get current model performance metrics
     """
-    return jsonify({
-        'accuracy': 0.873,
-        'precision': 0.812,
-        'recall': 0.854,
-        'f1_score': 0.832,
-        'auc_roc': 0.891,
-        'version': predictor.get_version(),
-        'last_trained': '2025-06-15T10:30:00Z',
-        'training_samples': 15420
-    })
+    return Response(metrics_bytes, media_type='application/json')
 
-@app.route('/model/retrain', methods=['POST'])
-def retrain_model():
+@app.post('/model/retrain')
+async def retrain_model():
     """
     Trigger model retraining with new data
     """
     try:
         # This would trigger an async retraining job
-        return jsonify({
+        return {
             'status': 'retraining_started',
             'job_id': 'train_job_123'
-        })
+        }
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return ORJSONResponse({'error': str(e)}, status_code=500)
 
 def get_risk_level(probability):
     """
@@ -111,5 +159,8 @@ def get_risk_level(probability):
         return 'low'
 
 if __name__ == '__main__':
+    import uvicorn
+
+    # Development only; production runs `uvicorn api.server:app --workers N`
     port = int(os.getenv('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)
+    uvicorn.run(app, host='0.0.0.0', port=port)
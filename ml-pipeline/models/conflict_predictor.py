@@ -1,13 +1,102 @@
 import os
+import fcntl
+import hashlib
+import threading
 import joblib
 import numpy as np
 from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 import logging
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Display names for the vector built by ConflictPredictor.features_to_vector
+FEATURE_NAMES = (
+    'Files changed',
+    'Additions',
+    'Deletions',
+    'Branch age',
+    'Base branch commits',
+    'Author experience',
+    'Overlapping files',
+    'Core files modified',
+    'File complexity',
+    'Recent conflicts'
+)
+N_FEATURES = len(FEATURE_NAMES)
+
+# Feature dict keys, in features_to_vector order
+FEATURE_KEYS = (
+    'files_changed',
+    'additions',
+    'deletions',
+    'branch_age_days',
+    'base_branch_commits_since_branch',
+    'author_experience_score',
+    'overlapping_files_ratio',
+    'modified_core_files',
+    'avg_file_complexity',
+    'recent_conflicts_count'
+)
+
+# Rows preallocated for batched predictions; matches the batch scheduler's limit
+MAX_BATCH = int(os.getenv('BATCH_SIZE', 32))
+
+# Value types fill_row accepts; anything else (numeric strings included) takes
+# the same per-row fallback predict would
+NUMERIC_TYPES = (int, float, np.number, np.bool_)
+
+# Factor labels reported by the heuristic, in heuristic_factors_batch column order
+HEURISTIC_FACTORS = (
+    'High number of file changes',
+    'Large code changes',
+    'Long-lived feature branch',
+    'Many commits in base branch'
+)
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _heuristic_njit(X, out):
+        """
+        Fused single-pass heuristic risk score, one row per PR
+        """
+        for i in range(X.shape[0]):
+            files_changed = X[i, 0]
+            total_changes = X[i, 1] + X[i, 2]
+            branch_age = X[i, 3]
+            risk_score = 0.0
+
+            if files_changed > 20:
+                risk_score += 0.3
+            elif files_changed > 10:
+                risk_score += 0.15
+
+            if total_changes > 500:
+                risk_score += 0.25
+            elif total_changes > 200:
+                risk_score += 0.15
+
+            if branch_age > 7:
+                risk_score += 0.2
+            elif branch_age > 3:
+                risk_score += 0.1
+
+            if X[i, 4] > 50:
+                risk_score += 0.25
+
+            if X[i, 6] > 0.5:
+                risk_score += 0.3
+
+            out[i] = min(risk_score, 0.95)
+else:
+    _heuristic_njit = None
+
 class ConflictPredictor:
     """
     Machine learning model for predicting merge conflicts
@@ -18,7 +107,15 @@ class ConflictPredictor:
         self.model_path = model_path or os.getenv('MODEL_PATH', 'models')
         self.model = None
         self.scaler = None
+        self._mean = None
+        self._inv_scale = None
+        self._session = None
+        self._tl_predictor = None
+        self._tl_dmatrix = None
+        self._trained = False
         self.version = '1.0.0'
+        self._scratch = np.empty((MAX_BATCH, N_FEATURES), dtype=np.float64)
+        self._scratch_lock = threading.Lock()
         self.load_model()
 
     def load_model(self):
@@ -32,6 +129,9 @@ class ConflictPredictor:
             if os.path.exists(model_file) and os.path.exists(scaler_file):
                 self.model = joblib.load(model_file)
                 self.scaler = joblib.load(scaler_file)
+                self.cache_scaler_params()
+                self._trained = hasattr(self.model, 'feature_importances_') and self._mean is not None
+                self._compile_runtime()
                 logger.info(f'Model loaded from {model_file}')
             else:
                 logger.warning('No pre-trained model found, initializing new model')
@@ -56,8 +156,129 @@ class ConflictPredictor:
             random_state=42
         )
         self.scaler = StandardScaler()
+        self._session = None
+        self._tl_predictor = None
+        self.cache_scaler_params()
+        self._trained = False
         logger.info('Initialized new Gradient Boosting model')
 
+    def cache_scaler_params(self):
+        """
+        Cache the fitted scaler's mean and inverse scale so predictions can
+        standardize features without going through StandardScaler.transform
+        """
+        if self.scaler is not None and hasattr(self.scaler, 'mean_'):
+            # Keep float64, the precision the scaler (and model) were fitted in
+            self._mean = self.scaler.mean_.astype(np.float64)
+            self._inv_scale = (1.0 / self.scaler.scale_).astype(np.float64)
+        else:
+            self._mean = None
+            self._inv_scale = None
+
+    def _compile_runtime(self):
+        """
+        Compile the trained model for fast inference: a Treelite shared
+        library first, then ONNX Runtime, falling back to sklearn's
+        predict_proba if neither is available
+        """
+        self._session = None
+        self._tl_predictor = None
+
+        if not self._trained:
+            return
+
+        if not self._compile_treelite():
+            self._compile_onnx()
+
+    def _compile_treelite(self):
+        """
+        Compile the ensemble to a native library with quantized thresholds
+        """
+        try:
+            import treelite
+            import tl2cgen
+
+            model_file = os.path.join(self.model_path, 'conflict_predictor.pkl')
+            with open(model_file, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:16]
+
+            # Keyed on the pickle's contents; the hyphen keeps it from ever being
+            # picked up as an extension module by `import models.conflict_predictor`
+            lib_file = os.path.join(self.model_path, f'gbdt-treelite-{digest}.so')
+
+            if not os.path.exists(lib_file):
+                # Workers start together: one compiles, the rest wait and reuse it
+                with open(f'{lib_file}.lock', 'w') as lock:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                    if not os.path.exists(lib_file):
+                        tmp_file = f'{lib_file}.{os.getpid()}'
+                        try:
+                            tl2cgen.export_lib(
+                                treelite.sklearn.import_model(self.model),
+                                toolchain='gcc',
+                                libpath=tmp_file,
+                                params={'parallel_comp': os.cpu_count() or 1, 'quantize': 1}
+                            )
+                            os.replace(tmp_file, lib_file)
+                        finally:
+                            # Only left behind if the build failed partway
+                            if os.path.exists(tmp_file):
+                                os.remove(tmp_file)
+
+            self._tl_predictor = tl2cgen.Predictor(lib_file)
+            self._tl_dmatrix = tl2cgen.DMatrix
+            logger.info(f'Serving model with Treelite library {lib_file}')
+            return True
+
+        except Exception as e:
+            logger.warning(f'Treelite compilation unavailable: {e}')
+            self._tl_predictor = None
+            return False
+
+    def _compile_onnx(self):
+        """
+        Convert the model to ONNX and serve it with ONNX Runtime
+        """
+        try:
+            import onnxruntime as ort
+            from skl2onnx import convert_sklearn
+            from skl2onnx.common.data_types import FloatTensorType
+
+            onnx_model = convert_sklearn(
+                self.model,
+                initial_types=[('input', FloatTensorType([None, N_FEATURES]))],
+                options={id(self.model): {'zipmap': False}}
+            )
+            # Converted in memory per worker; nothing reads it back from disk
+            onnx_bytes = onnx_model.SerializeToString()
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self._session = ort.InferenceSession(
+                onnx_bytes,
+                sess_options=options,
+                providers=['CPUExecutionProvider']
+            )
+            logger.info('Serving model with ONNX Runtime')
+
+        except Exception as e:
+            logger.warning(f'ONNX conversion unavailable, using sklearn: {e}')
+            self._session = None
+
+    def _positive_proba(self, X):
+        """
+        Conflict probability for each row of a scaled feature matrix
+        """
+        if self._tl_predictor is not None:
+            X = np.asarray(X, dtype=np.float32)
+            return self._tl_predictor.predict(self._tl_dmatrix(X)).reshape(len(X), -1)[:, -1]
+
+        if self._session is not None:
+            inputs = {'input': np.asarray(X, dtype=np.float32)}
+            return self._session.run(None, inputs)[1][:, 1]
+
+        return self.model.predict_proba(X)[:, 1]
+
     def predict(self, features):
         """
         Predict merge conflict probability
@@ -68,81 +289,229 @@ class ConflictPredictor:
         Returns:
             dict: Prediction results with probability and contributing factors
         """
+        # Untrained model: no vector or scaling needed
+        if not self._trained:
+            return self.heuristic_prediction(features)
+
         try:
-            # Convert features to array
             feature_vector = self.features_to_vector(features)
+            scaled_features = ((feature_vector - self._mean) * self._inv_scale).reshape(1, -1)
 
-            # If model is trained, make prediction
-            if hasattr(self.model, 'feature_importances_'):
-                # Scale features
-                if self.scaler and hasattr(self.scaler, 'mean_'):
-                    scaled_features = self.scaler.transform([feature_vector])
-                else:
-                    scaled_features = [feature_vector]
+            # Get probability
+            probability = self._positive_proba(scaled_features)[0]
 
-                # Get probability
-                probability = self.model.predict_proba(scaled_features)[0][1]
+            # Get feature importance
+            factors = self.get_contributing_factors(features, feature_vector)
 
-                # Get feature importance
-                factors = self.get_contributing_factors(features, feature_vector)
-
-                return {
-                    'probability': probability,
-                    'factors': factors
-                }
-            else:
-                # Model not trained, use heuristic
-                return self.heuristic_prediction(features)
+            return {
+                'probability': probability,
+                'factors': factors
+            }
 
         except Exception as e:
             logger.error(f'Error making prediction: {e}')
             return self.heuristic_prediction(features)
 
+    def predict_many(self, feature_dicts):
+        """
+        Predict merge conflict probabilities for several PRs at once
+
+        Args:
+            feature_dicts (list): Extracted feature dicts, one per PR
+
+        Returns:
+            np.ndarray: Conflict probability per PR
+        """
+        return self._score_many(feature_dicts, with_factors=False)[0]
+
+    def predict_many_results(self, feature_dicts):
+        """
+        Predict several PRs at once, returning per-PR results shaped like predict
+
+        Args:
+            feature_dicts (list): Extracted feature dicts, one per PR
+
+        Returns:
+            list: Prediction results with probability and contributing factors
+        """
+        probabilities, factors = self._score_many(feature_dicts, with_factors=True)
+        return [
+            {'probability': probability, 'factors': row_factors}
+            for probability, row_factors in zip(probabilities, factors)
+        ]
+
+    def _score_many(self, feature_dicts, with_factors):
+        """
+        Score every PR that fits the feature matrix in one call; PRs whose
+        features can't be converted fall back to the scalar heuristic on
+        their own, so they don't affect the rest of the batch
+        """
+        n = len(feature_dicts)
+        probabilities = np.empty(n)
+        factors = [None] * n if with_factors else None
+
+        # The scratch buffer is shared by the scheduler and /predict/batch threads
+        with self._scratch_lock:
+            if n > len(self._scratch):
+                self._scratch = np.empty((n, N_FEATURES), dtype=np.float64)
+
+            rows, bad_rows = self._fill_rows(feature_dicts)
+            X = self._scratch[:len(rows)]
+            scored = False
+
+            if self._trained and rows:
+                try:
+                    # Standardize in place: one pass over the buffer, no new array
+                    np.subtract(X, self._mean, out=X)
+                    np.multiply(X, self._inv_scale, out=X)
+                    probabilities[rows] = self._positive_proba(X)
+
+                    if with_factors:
+                        shared = self.get_contributing_factors(feature_dicts[rows[0]], None)
+                        for i in rows:
+                            factors[i] = list(shared)
+                    scored = True
+
+                except Exception as e:
+                    logger.error(f'Error making batch prediction: {e}')
+
+                    # The heuristic needs the raw values the scaling overwrote
+                    self._fill_rows(feature_dicts)
+
+            if rows and not scored:
+                probabilities[rows] = self.heuristic_prediction_batch(X)
+                if with_factors:
+                    for i, row_factors in zip(rows, self.heuristic_factors_batch(X)):
+                        factors[i] = row_factors
+
+        # Same fallback predict uses; raises if the heuristic can't score it either
+        for i in bad_rows:
+            result = self.heuristic_prediction(feature_dicts[i])
+            probabilities[i] = result['probability']
+            if with_factors:
+                factors[i] = result['factors']
+
+        return probabilities, factors
+
+    def _fill_rows(self, feature_dicts):
+        """
+        Fill scratch rows from feature dicts, skipping any that aren't numeric
+
+        Returns:
+            tuple: Indices filled (in scratch row order) and indices skipped
+        """
+        rows = []
+        bad_rows = []
+        for i, features in enumerate(feature_dicts):
+            try:
+                self.fill_row(len(rows), features)
+                rows.append(i)
+            except (TypeError, ValueError):
+                bad_rows.append(i)
+        return rows, bad_rows
+
+    def fill_row(self, i, features):
+        """
+        Write a feature dict into row i of the scratch buffer in place
+        """
+        values = [features.get(key, 0) for key in FEATURE_KEYS]
+        # NumPy would silently convert '0.7' on assignment; predict rejects it
+        if not all(isinstance(value, NUMERIC_TYPES) for value in values):
+            raise TypeError('Feature values must be numeric')
+        self._scratch[i] = values
+
+    def heuristic_prediction_batch(self, X):
+        """
+        Vectorized heuristic risk score over a stacked feature matrix
+        """
+        if _heuristic_njit is not None:
+            out = np.empty(len(X))
+            _heuristic_njit(X, out)
+            return out
+
+        files_changed = X[:, 0]
+        total_changes = X[:, 1] + X[:, 2]
+        branch_age = X[:, 3]
+
+        risk_score = (
+            0.3 * (files_changed > 20)
+            + 0.15 * ((files_changed > 10) & (files_changed <= 20))
+            + 0.25 * (total_changes > 500)
+            + 0.15 * ((total_changes > 200) & (total_changes <= 500))
+            + 0.2 * (branch_age > 7)
+            + 0.1 * ((branch_age > 3) & (branch_age <= 7))
+            + 0.25 * (X[:, 4] > 50)
+            + 0.3 * (X[:, 6] > 0.5)
+        )
+
+        return np.minimum(risk_score, 0.95)
+
+    def heuristic_factors_batch(self, X):
+        """
+        Heuristic contributing factors for each row of a feature matrix
+        """
+        masks = np.column_stack([
+            X[:, 0] > 10,
+            (X[:, 1] + X[:, 2]) > 200,
+            X[:, 3] > 3,
+            X[:, 4] > 20
+        ])
+
+        return [[HEURISTIC_FACTORS[i] for i in np.flatnonzero(row)] for row in masks]
+
     def heuristic_prediction(self, features):
         """
         Fallback heuristic-based prediction when model is not trained
         """
+        # Scalar twin of heuristic_prediction_batch; one PR is cheaper in plain Python
+        files = features.get('files_changed', 0)
+        adds = features.get('additions', 0)
+        dels = features.get('deletions', 0)
+        age = features.get('branch_age_days', 0)
+        base = features.get('base_branch_commits_since_branch', 0)
+        overlap = features.get('overlapping_files_ratio', 0)
+        total_changes = adds + dels
+
         # Calculate risk based on known indicators
         risk_score = 0.0
 
         # Large number of file changes increases risk
-        if features.get('files_changed', 0) > 20:
+        if files > 20:
             risk_score += 0.3
-        elif features.get('files_changed', 0) > 10:
+        elif files > 10:
             risk_score += 0.15
 
         # Large code changes increase risk
-        total_changes = features.get('additions', 0) + features.get('deletions', 0)
         if total_changes > 500:
             risk_score += 0.25
         elif total_changes > 200:
             risk_score += 0.15
 
         # Long-lived branches increase risk
-        if features.get('branch_age_days', 0) > 7:
+        if age > 7:
             risk_score += 0.2
-        elif features.get('branch_age_days', 0) > 3:
+        elif age > 3:
             risk_score += 0.1
 
         # High activity in base branch increases risk
-        if features.get('base_branch_commits_since_branch', 0) > 50:
+        if base > 50:
             risk_score += 0.25
 
         # Overlapping file changes with recent PRs
-        if features.get('overlapping_files_ratio', 0) > 0.5:
+        if overlap > 0.5:
             risk_score += 0.3
 
         probability = min(risk_score, 0.95)
 
         factors = []
-        if features.get('files_changed', 0) > 10:
-            factors.append('High number of file changes')
+        if files > 10:
+            factors.append(HEURISTIC_FACTORS[0])
         if total_changes > 200:
-            factors.append('Large code changes')
-        if features.get('branch_age_days', 0) > 3:
-            factors.append('Long-lived feature branch')
-        if features.get('base_branch_commits_since_branch', 0) > 20:
-            factors.append('Many commits in base branch')
+            factors.append(HEURISTIC_FACTORS[1])
+        if age > 3:
+            factors.append(HEURISTIC_FACTORS[2])
+        if base > 20:
+            factors.append(HEURISTIC_FACTORS[3])
 
         return {
             'probability': probability,
@@ -153,18 +522,7 @@ class ConflictPredictor:
         """
         Convert feature dictionary to numpy array
         """
-        return np.array([
-            features.get('files_changed', 0),
-            features.get('additions', 0),
-            features.get('deletions', 0),
-            features.get('branch_age_days', 0),
-            features.get('base_branch_commits_since_branch', 0),
-            features.get('author_experience_score', 0),
-            features.get('overlapping_files_ratio', 0),
-            features.get('modified_core_files', 0),
-            features.get('avg_file_complexity', 0),
-            features.get('recent_conflicts_count', 0)
-        ])
+        return np.array([features.get(key, 0) for key in FEATURE_KEYS])
 
     def get_contributing_factors(self, features, feature_vector):
         """
@@ -174,27 +532,22 @@ class ConflictPredictor:
 
         if hasattr(self.model, 'feature_importances_'):
             importance = self.model.feature_importances_
-            feature_names = [
-                'Files changed',
-                'Additions',
-                'Deletions',
-                'Branch age',
-                'Base branch commits',
-                'Author experience',
-                'Overlapping files',
-                'Core files modified',
-                'File complexity',
-                'Recent conflicts'
-            ]
-
-            # Get top 3 features
-            top_indices = np.argsort(importance)[-3:][::-1]
+
+            # Get top 3 features without sorting the whole array
+            top_indices = np.argpartition(importance, -3)[-3:]
+            top_indices = top_indices[np.argsort(-importance[top_indices])]
             for idx in top_indices:
                 if importance[idx] > 0.1:
-                    factors.append(feature_names[idx])
+                    factors.append(FEATURE_NAMES[idx])
 
         return factors
 
+    def is_trained(self):
+        """
+        Check if a fitted model and scaler are available
+        """
+        return self._trained
+
     def is_loaded(self):
         """
         Check if model is loaded
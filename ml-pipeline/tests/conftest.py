@@ -0,0 +1,49 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# Same import root the API server uses
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.conflict_predictor import ConflictPredictor, FEATURE_KEYS
+
+
+def random_features(rng, n):
+    """
+    Feature dicts spread across every heuristic threshold
+    """
+    columns = np.column_stack([
+        rng.integers(0, 30, n),
+        rng.integers(0, 400, n),
+        rng.integers(0, 300, n),
+        rng.integers(0, 10, n),
+        rng.integers(0, 60, n),
+        rng.random(n),
+        rng.random(n),
+        rng.integers(0, 5, n),
+        rng.random(n),
+        rng.integers(0, 3, n)
+    ])
+    return [dict(zip(FEATURE_KEYS, row)) for row in columns.tolist()]
+
+
+@pytest.fixture
+def untrained_predictor(tmp_path):
+    return ConflictPredictor(model_path=str(tmp_path))
+
+
+@pytest.fixture(scope='session')
+def trained_predictor(tmp_path_factory):
+    model_path = str(tmp_path_factory.mktemp('model'))
+
+    predictor = ConflictPredictor(model_path=model_path)
+    rng = np.random.default_rng(0)
+    X = rng.random((500, len(FEATURE_KEYS))) * 50
+    y = (X[:, 0] + X[:, 3] > 50).astype(int)
+    predictor.scaler.fit(X)
+    predictor.model.fit(predictor.scaler.transform(X), y)
+    predictor.save_model()
+
+    # Reload from disk so the compiled runtime (if available) is exercised
+    return ConflictPredictor(model_path=model_path)
@@ -0,0 +1,148 @@
+import asyncio
+import pytest
+
+from utils.batch_scheduler import BatchScheduler
+
+GOOD = {'files_changed': 25, 'additions': 300, 'deletions': 250}
+
+
+def run_with_scheduler(predictor, coro_fn, **kwargs):
+    """
+    Start a scheduler on a fresh event loop, run coro_fn(scheduler), stop it
+    """
+    async def main():
+        scheduler = BatchScheduler(predictor, **kwargs)
+        scheduler.start()
+        try:
+            return await asyncio.wait_for(coro_fn(scheduler), timeout=10)
+        finally:
+            await scheduler.stop()
+
+    return asyncio.run(main())
+
+
+def count_batches(predictor, monkeypatch):
+    sizes = []
+    original = predictor.predict_many_results
+
+    def recording(features_list):
+        sizes.append(len(features_list))
+        return original(features_list)
+
+    monkeypatch.setattr(predictor, 'predict_many_results', recording)
+    return sizes
+
+
+def test_concurrent_requests_share_one_model_call(untrained_predictor, monkeypatch):
+    sizes = count_batches(untrained_predictor, monkeypatch)
+    features_list = [dict(GOOD, files_changed=i) for i in range(8)]
+
+    async def scenario(scheduler):
+        return await asyncio.gather(*(scheduler.submit(f, i) for i, f in enumerate(features_list)))
+
+    results = run_with_scheduler(untrained_predictor, scenario, max_delay_ms=50)
+
+    assert sizes == [8]
+    for result, features in zip(results, features_list):
+        assert result == untrained_predictor.heuristic_prediction(features)
+
+
+def test_batches_respect_max_size(untrained_predictor, monkeypatch):
+    sizes = count_batches(untrained_predictor, monkeypatch)
+
+    async def scenario(scheduler):
+        return await asyncio.gather(*(scheduler.submit(GOOD, i) for i in range(10)))
+
+    run_with_scheduler(untrained_predictor, scenario, max_batch_size=4, max_delay_ms=50)
+
+    assert sizes == [4, 4, 2]
+
+
+@pytest.mark.parametrize('predictor_fixture', ['untrained_predictor', 'trained_predictor'])
+def test_bad_request_raises_and_worker_survives(predictor_fixture, request):
+    predictor = request.getfixturevalue(predictor_fixture)
+    bad = {'base_branch_commits_since_branch': 'x'}
+
+    async def scenario(scheduler):
+        outcomes = await asyncio.gather(
+            scheduler.submit(bad, 'bad'),
+            scheduler.submit(GOOD, 'good'),
+            return_exceptions=True
+        )
+        follow_up = await scheduler.submit(GOOD, 'follow-up')
+        return outcomes, follow_up, scheduler.worker.done(), scheduler.pending
+
+    (bad_outcome, good_outcome), follow_up, worker_done, pending = run_with_scheduler(
+        predictor, scenario, max_delay_ms=50
+    )
+
+    assert isinstance(bad_outcome, TypeError)
+    assert good_outcome['probability'] == pytest.approx(predictor.predict(GOOD)['probability'])
+    assert follow_up == good_outcome
+    assert not worker_done
+    assert pending == {}
+
+
+def test_bad_row_does_not_affect_its_batch(trained_predictor):
+    bad = dict(GOOD, recent_conflicts_count='x')
+
+    async def scenario(scheduler):
+        return await asyncio.gather(scheduler.submit(bad, 'bad'), scheduler.submit(GOOD, 'good'))
+
+    bad_result, good_result = run_with_scheduler(trained_predictor, scenario, max_delay_ms=50)
+
+    assert bad_result == trained_predictor.heuristic_prediction(bad)
+    assert good_result['probability'] == pytest.approx(trained_predictor.predict(GOOD)['probability'])
+    assert good_result['factors'] == trained_predictor.predict(GOOD)['factors']
+
+
+def test_waiters_released_when_scoring_fails(untrained_predictor, monkeypatch):
+    def fail(*args):
+        raise RuntimeError('model unavailable')
+
+    monkeypatch.setattr(untrained_predictor, 'predict_many_results', fail)
+    monkeypatch.setattr(untrained_predictor, 'predict', fail)
+
+    async def scenario(scheduler):
+        outcomes = await asyncio.gather(
+            *(scheduler.submit(GOOD, i) for i in range(3)),
+            return_exceptions=True
+        )
+        return outcomes, scheduler.pending
+
+    outcomes, pending = run_with_scheduler(untrained_predictor, scenario, max_delay_ms=50)
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert pending == {}
+
+
+def test_duplicate_keys_fan_out_one_prediction(untrained_predictor, monkeypatch):
+    sizes = count_batches(untrained_predictor, monkeypatch)
+    other = dict(GOOD, files_changed=5)
+
+    async def scenario(scheduler):
+        return await asyncio.gather(
+            *(scheduler.submit(GOOD, 'same') for _ in range(5)),
+            scheduler.submit(other, 'other')
+        )
+
+    results = run_with_scheduler(untrained_predictor, scenario, max_delay_ms=50)
+
+    assert sizes == [2]
+    assert all(result == untrained_predictor.heuristic_prediction(GOOD) for result in results[:5])
+    assert results[5] == untrained_predictor.heuristic_prediction(other)
+
+    # Each waiter owns its result
+    assert len({id(result) for result in results[:5]}) == 5
+    assert len({id(result['factors']) for result in results[:5]}) == 5
+
+
+def test_requests_without_key_are_not_coalesced(untrained_predictor, monkeypatch):
+    sizes = count_batches(untrained_predictor, monkeypatch)
+
+    async def scenario(scheduler):
+        return await asyncio.gather(*(scheduler.submit(GOOD) for _ in range(3)))
+
+    run_with_scheduler(untrained_predictor, scenario, max_delay_ms=50)
+
+    assert sizes == [3]
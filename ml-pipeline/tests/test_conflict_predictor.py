@@ -0,0 +1,149 @@
+import os
+import numpy as np
+import pytest
+
+import models.conflict_predictor as conflict_predictor
+from models.conflict_predictor import ConflictPredictor, FEATURE_KEYS, FEATURE_NAMES
+from conftest import random_features
+
+
+def test_heuristic_scalar_matches_batch(untrained_predictor):
+    features_list = random_features(np.random.default_rng(1), 2000)
+    X = np.stack([untrained_predictor.features_to_vector(f) for f in features_list])
+
+    probabilities = untrained_predictor.heuristic_prediction_batch(X)
+    factors = untrained_predictor.heuristic_factors_batch(X)
+
+    for features, probability, row_factors in zip(features_list, probabilities, factors):
+        expected = untrained_predictor.heuristic_prediction(features)
+        assert probability == pytest.approx(expected['probability'], abs=1e-12)
+        assert row_factors == expected['factors']
+
+
+def test_heuristic_numba_matches_numpy(untrained_predictor, monkeypatch):
+    if conflict_predictor._heuristic_njit is None:
+        pytest.skip('numba not installed')
+
+    features_list = random_features(np.random.default_rng(2), 2000)
+    X = np.stack([untrained_predictor.features_to_vector(f) for f in features_list])
+
+    jitted = untrained_predictor.heuristic_prediction_batch(X)
+    monkeypatch.setattr(conflict_predictor, '_heuristic_njit', None)
+    vectorized = untrained_predictor.heuristic_prediction_batch(X)
+
+    np.testing.assert_allclose(jitted, vectorized, rtol=0, atol=1e-12)
+
+
+def test_predict_many_untrained_matches_predict(untrained_predictor):
+    features_list = random_features(np.random.default_rng(3), 500)
+
+    probabilities = untrained_predictor.predict_many(features_list)
+    expected = [untrained_predictor.predict(f)['probability'] for f in features_list]
+
+    np.testing.assert_allclose(probabilities, expected, rtol=0, atol=1e-12)
+
+
+def test_predict_many_matches_baseline(trained_predictor):
+    features_list = random_features(np.random.default_rng(4), 2000)
+    X = np.array([[f[key] for key in FEATURE_KEYS] for f in features_list], dtype=float)
+
+    # Baseline: the scaler and model exactly as trained
+    baseline = trained_predictor.model.predict_proba(trained_predictor.scaler.transform(X))[:, 1]
+
+    np.testing.assert_allclose(trained_predictor.predict_many(features_list), baseline, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(
+        [trained_predictor.predict(f)['probability'] for f in features_list[:200]],
+        baseline[:200],
+        rtol=0,
+        atol=1e-9
+    )
+
+
+def test_reloaded_model_can_be_saved_in_place(trained_predictor):
+    features_list = random_features(np.random.default_rng(7), 100)
+    expected = trained_predictor.predict_many(features_list)
+
+    # Load, save over the files it was loaded from, load again
+    reloaded = ConflictPredictor(model_path=trained_predictor.model_path)
+    reloaded.save_model()
+    resaved = ConflictPredictor(model_path=trained_predictor.model_path)
+
+    assert resaved.is_trained()
+    np.testing.assert_allclose(resaved.predict_many(features_list), expected, rtol=0, atol=1e-12)
+
+
+def test_predict_many_results_match_predict(trained_predictor):
+    features_list = random_features(np.random.default_rng(5), 50)
+
+    for result, features in zip(trained_predictor.predict_many_results(features_list), features_list):
+        expected = trained_predictor.predict(features)
+        assert result['probability'] == pytest.approx(expected['probability'], abs=1e-9)
+        assert result['factors'] == expected['factors']
+
+
+@pytest.mark.parametrize('predictor_fixture', ['untrained_predictor', 'trained_predictor'])
+def test_predict_many_isolates_non_numeric_rows(predictor_fixture, request):
+    predictor = request.getfixturevalue(predictor_fixture)
+    good = {'files_changed': 25, 'additions': 300, 'deletions': 250}
+    bad = dict(good, recent_conflicts_count='x')
+    numeric_string = dict(good, recent_conflicts_count='3')
+
+    probabilities = predictor.predict_many([good, bad, good, numeric_string])
+
+    # The good rows are scored exactly as on their own
+    assert probabilities[0] == pytest.approx(predictor.predict_many([good])[0], abs=1e-12)
+    assert probabilities[2] == probabilities[0]
+    # Bad rows, numeric strings included, fall back to the heuristic as predict does
+    for i, features in ((1, bad), (3, numeric_string)):
+        assert probabilities[i] == pytest.approx(predictor.heuristic_prediction(features)['probability'])
+        assert probabilities[i] == pytest.approx(predictor.predict(features)['probability'])
+
+
+@pytest.mark.parametrize('features', [
+    {'base_branch_commits_since_branch': 'x'},
+    {'overlapping_files_ratio': '0.7', 'files_changed': 25}
+])
+def test_predict_many_raises_when_heuristic_cannot_score(untrained_predictor, features):
+    with pytest.raises(TypeError):
+        untrained_predictor.predict(features)
+    with pytest.raises(TypeError):
+        untrained_predictor.predict_many([features])
+
+
+def test_predict_many_keeps_full_precision(untrained_predictor):
+    features = {'overlapping_files_ratio': 0.50000001, 'additions': 100, 'deletions': 100.00000001}
+
+    assert untrained_predictor.predict_many([features])[0] == pytest.approx(0.45)
+    assert untrained_predictor.predict(features)['probability'] == pytest.approx(0.45)
+
+
+def test_predict_many_grows_scratch_buffer(untrained_predictor):
+    features_list = random_features(np.random.default_rng(6), len(untrained_predictor._scratch) + 10)
+
+    assert len(untrained_predictor.predict_many(features_list)) == len(features_list)
+
+
+def test_contributing_factors_are_top_importances(trained_predictor):
+    importance = trained_predictor.model.feature_importances_
+    expected = [FEATURE_NAMES[i] for i in np.argsort(importance)[-3:][::-1] if importance[i] > 0.1]
+
+    assert trained_predictor.get_contributing_factors({}, None) == expected
+
+
+def test_failed_treelite_build_leaves_no_temp_file(trained_predictor, tmp_path, monkeypatch):
+    tl2cgen = pytest.importorskip('tl2cgen')
+    pytest.importorskip('treelite')
+
+    def partial_build(model, toolchain, libpath, params):
+        open(libpath, 'wb').close()
+        raise RuntimeError('compiler failed')
+
+    monkeypatch.setattr(tl2cgen, 'export_lib', partial_build)
+    trained_predictor.model_path, model_path = str(tmp_path), trained_predictor.model_path
+    try:
+        trained_predictor.save_model()
+        assert not trained_predictor._compile_treelite()
+    finally:
+        trained_predictor.model_path = model_path
+
+    assert not [name for name in os.listdir(tmp_path) if '.so.' in name and not name.endswith('.lock')]
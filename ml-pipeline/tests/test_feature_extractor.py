@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+
+import utils.feature_extractor as feature_extractor
+from utils.feature_extractor import FeatureExtractor, pr_key
+
+
+def test_count_core_files_is_case_insensitive():
+    extractor = FeatureExtractor()
+    pr = {'files': ['Dockerfile', 'src/Config.py', {'filename': 'lib/util.js'}, 'README.md']}
+
+    assert extractor.count_core_files(pr) == 3
+
+
+def test_branch_age_handles_utc_suffix_and_naive_timestamps():
+    extractor = FeatureExtractor()
+    now = datetime(2026, 10, 15, tzinfo=timezone.utc)
+
+    assert extractor.calculate_branch_age({'created_at': '2026-10-01T00:00:00Z'}, now) == 14
+    assert extractor.calculate_branch_age({'createdAt': '2026-10-05T00:00:00'}, now) == 10
+    assert extractor.calculate_branch_age({'created_at': 'not a date'}, now) == 0
+
+
+def test_pr_key_ignores_key_order():
+    assert pr_key({'a': 1, 'b': [1, 2]}) == pr_key({'b': [1, 2], 'a': 1})
+    assert pr_key({'a': 1}) != pr_key({'a': 2})
+
+
+def test_feature_cache_is_bounded_and_ages_branches(monkeypatch):
+    monkeypatch.setattr(feature_extractor, 'FEATURE_CACHE_SIZE', 2)
+    extractor = FeatureExtractor()
+    prs = [{'number': i, 'files': ['config.yml'], 'created_at': '2026-10-01T00:00:00Z'} for i in range(3)]
+
+    for pr in prs:
+        extractor.extract_pr_features(pr)
+
+    assert [key[0] for key in extractor._cache] == [1, 2]
+
+    later = datetime(2026, 10, 20, tzinfo=timezone.utc)
+    features = extractor.extract_pr_features(prs[2], now=later)
+    assert features['modified_core_files'] == 1
+    assert features['branch_age_days'] == 19
+
+    # Returned dicts are copies; mutating one doesn't touch the cache
+    features['files_changed'] = 99
+    assert extractor.extract_pr_features(prs[2])['files_changed'] == 0
+
+
+def test_extract_pr_features_many_uses_executor():
+    from concurrent.futures import ThreadPoolExecutor
+
+    extractor = FeatureExtractor()
+    prs = [{'number': i, 'additions': i} for i in range(5)]
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        parallel = extractor.extract_pr_features_many(prs, executor)
+
+    assert parallel == extractor.extract_pr_features_many(prs)
@@ -0,0 +1,148 @@
+import os
+import asyncio
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = int(os.getenv('BATCH_SIZE', 32))
+MAX_DELAY_MS = float(os.getenv('BATCH_TIMEOUT_MS', 5))
+
+
+class BatchScheduler:
+    """
+    Coalesce concurrent prediction requests into a single model call
+    """
+
+    def __init__(self, predictor, max_batch_size=MAX_BATCH, max_delay_ms=MAX_DELAY_MS):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000.0
+        self.queue = None
+        self.worker = None
+        # Waiters per in-flight key; duplicates join an existing entry
+        self.pending = {}
+
+    def start(self):
+        """
+        Start the worker task on the running event loop
+        """
+        self.queue = asyncio.Queue()
+        self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Cancel the worker task
+        """
+        if self.worker:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+
+    async def submit(self, features, key=None):
+        """
+        Enqueue features and wait until the batch containing them is scored
+
+        Args:
+            features (dict): Extracted features from PR data
+            key (int): PR identity (see pr_key); requests sharing a key while
+                one is in flight are answered by a single prediction
+
+        Returns:
+            dict: Prediction results with probability and contributing factors
+
+        Raises:
+            Exception: Whatever made this request's features unscorable
+        """
+        if key is None:
+            key = object()
+
+        done = asyncio.Event()
+        slot = {}
+
+        waiters = self.pending.get(key)
+        if waiters is not None:
+            waiters.append((done, slot))
+        else:
+            self.pending[key] = [(done, slot)]
+            await self.queue.put((key, features))
+
+        await done.wait()
+        if 'error' in slot:
+            raise slot['error']
+        return slot['result']
+
+    async def _run(self):
+        """
+        Worker loop: wait for the first request, then collect more until the
+        batch is full or the queue delay has elapsed
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._process(batch)
+            except Exception as e:
+                # _process always releases its waiters; keep the worker alive
+                logger.error(f'Error processing batch: {e}')
+
+    async def _process(self, batch):
+        """
+        Score a batch off the event loop and hand results back
+        """
+        features_list = [features for _, features in batch]
+        results = None
+
+        try:
+            try:
+                # Run the model in a thread so new requests keep queueing meanwhile
+                results = await asyncio.to_thread(
+                    self.predictor.predict_many_results, features_list
+                )
+            except Exception as e:
+                logger.error(f'Error making batch prediction: {e}')
+
+                # Score requests one at a time so a bad one only fails itself
+                results = await asyncio.to_thread(self._predict_each, features_list)
+
+        finally:
+            # Every waiter must be released, even if scoring failed or was cancelled
+            for i, (key, _) in enumerate(batch):
+                result = results[i] if results is not None else RuntimeError('Batch prediction failed')
+
+                for done, slot in self.pending.pop(key, ()):
+                    if isinstance(result, Exception):
+                        slot['error'] = result
+                    else:
+                        slot['result'] = {
+                            'probability': result['probability'],
+                            'factors': list(result['factors'])
+                        }
+                    done.set()
+
+    def _predict_each(self, features_list):
+        """
+        Predict requests individually, keeping each one's error as its result
+        """
+        results = []
+        for features in features_list:
+            try:
+                results.append(self.predictor.predict(features))
+            except Exception as e:
+                results.append(e)
+        return results
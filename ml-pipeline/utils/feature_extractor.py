@@ -1,37 +1,78 @@
+import os
+import re
 import logging
-from datetime import datetime
+import threading
+import orjson
+import xxhash
+from datetime import datetime, timezone
+from collections import OrderedDict
+from functools import partial
+
+try:
+    import ciso8601
+except ImportError:
+    ciso8601 = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Filename fragments that mark a core/critical file
+CORE_FILE_PATTERNS = (
+    'config',
+    'package.json',
+    'requirements.txt',
+    'Dockerfile',
+    'schema',
+    'migration',
+    'core/',
+    'lib/',
+    'index'
+)
+
+FEATURE_CACHE_SIZE = int(os.getenv('FEATURE_CACHE_SIZE', 4096))
+
+
+def pr_key(pr_data):
+    """
+    64-bit content hash of a PR payload, independent of key order
+    """
+    return xxhash.xxh3_64_intdigest(
+        orjson.dumps(pr_data, option=orjson.OPT_SORT_KEYS, default=str)
+    )
+
+
 class FeatureExtractor:
     """
     Extract features from GitHub PR data for ML model
     """
 
-    def extract_pr_features(self, pr_data):
+    def __init__(self):
+        # One alternation scans each filename for every pattern in a single pass
+        self._core_re = re.compile(
+            '|'.join(map(re.escape, CORE_FILE_PATTERNS)),
+            re.IGNORECASE
+        )
+        # LRU of cache key -> (static features, created_at); holds no raw payloads
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def extract_pr_features(self, pr_data, now=None, digest=None):
         """
         Extract features from pull request data
 
         Args:
             pr_data (dict): Raw PR data from GitHub API or extension
+            now (datetime): Reference time for branch age, defaults to the current UTC time
+            digest (int): Precomputed pr_key of the payload, if the caller has one
 
         Returns:
             dict: Extracted features
         """
         try:
-            features = {
-                'files_changed': pr_data.get('filesChanged', pr_data.get('files_changed', 0)),
-                'additions': pr_data.get('additions', 0),
-                'deletions': pr_data.get('deletions', 0),
-                'branch_age_days': self.calculate_branch_age(pr_data),
-                'base_branch_commits_since_branch': pr_data.get('base_branch_commits', 0),
-                'author_experience_score': self.calculate_author_experience(pr_data),
-                'overlapping_files_ratio': pr_data.get('overlapping_ratio', 0.0),
-                'modified_core_files': self.count_core_files(pr_data),
-                'avg_file_complexity': self.estimate_complexity(pr_data),
-                'recent_conflicts_count': pr_data.get('recent_conflicts', 0)
-            }
+            static_features, created = self._extract_cached(pr_data, digest)
+
+            features = dict(static_features)
+            features['branch_age_days'] = self.branch_age_days(created, now)
 
             logger.info(f"Extracted features for PR: {features}")
             return features
@@ -40,19 +81,104 @@ class FeatureExtractor:
             logger.error(f'Error extracting features: {e}')
             return self.get_default_features()
 
-    def calculate_branch_age(self, pr_data):
+    def cache_key(self, pr_data, digest=None):
+        """
+        Identity of a PR payload: number, head SHA, update time and content hash
+        """
+        head = pr_data.get('head')
+        return (
+            pr_data.get('number'),
+            head.get('sha') if isinstance(head, dict) else pr_data.get('head_sha'),
+            pr_data.get('updated_at') or pr_data.get('updatedAt'),
+            digest if digest is not None else pr_key(pr_data)
+        )
+
+    def _extract_cached(self, pr_data, digest=None):
+        """
+        Bounded LRU in front of _extract_static
+        """
+        key = self.cache_key(pr_data, digest)
+
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        cached = self._extract_static(pr_data)
+
+        with self._cache_lock:
+            self._cache[key] = cached
+            self._cache.move_to_end(key)
+            if len(self._cache) > FEATURE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+        return cached
+
+    def _extract_static(self, pr_data):
+        """
+        Extract everything that depends only on the payload; branch age is
+        returned as the parsed creation time so it can be aged per request
+        """
+        features = {
+            'files_changed': pr_data.get('filesChanged', pr_data.get('files_changed', 0)),
+            'additions': pr_data.get('additions', 0),
+            'deletions': pr_data.get('deletions', 0),
+            'branch_age_days': 0,
+            'base_branch_commits_since_branch': pr_data.get('base_branch_commits', 0),
+            'author_experience_score': self.calculate_author_experience(pr_data),
+            'overlapping_files_ratio': pr_data.get('overlapping_ratio', 0.0),
+            'modified_core_files': self.count_core_files(pr_data),
+            'avg_file_complexity': self.estimate_complexity(pr_data),
+            'recent_conflicts_count': pr_data.get('recent_conflicts', 0)
+        }
+
+        return features, self.parse_created_at(pr_data)
+
+    def extract_pr_features_many(self, prs, executor=None):
+        """
+        Extract features for several PRs against a single reference time,
+        spread over an executor's threads when one is given
+        """
+        now = datetime.now(timezone.utc)
+        if executor is not None:
+            return list(executor.map(partial(self.extract_pr_features, now=now), prs))
+        return [self.extract_pr_features(pr, now) for pr in prs]
+
+    def calculate_branch_age(self, pr_data, now=None):
         """
         Calculate how long the branch has been active
         """
+        return self.branch_age_days(self.parse_created_at(pr_data), now)
+
+    def parse_created_at(self, pr_data):
+        """
+        Parse the PR creation time as an aware datetime, or None
+        """
         created_at = pr_data.get('created_at') or pr_data.get('createdAt')
         if created_at:
             try:
-                created = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                age = (datetime.now() - created).days
-                return age
+                if ciso8601 is not None:
+                    created = ciso8601.parse_datetime(created_at)
+                else:
+                    created = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+
+                # Treat naive timestamps as UTC so they compare with an aware now
+                if created.tzinfo is None:
+                    created = created.replace(tzinfo=timezone.utc)
+
+                return created
             except:
                 pass
-        return 0
+        return None
+
+    def branch_age_days(self, created, now=None):
+        """
+        Whole days between the creation time and now
+        """
+        if created is None:
+            return 0
+        return ((now or datetime.now(timezone.utc)) - created).days
 
     def calculate_author_experience(self, pr_data):
         """
@@ -73,25 +199,10 @@ class FeatureExtractor:
         """
         files = pr_data.get('files', [])
         if isinstance(files, list):
-            core_patterns = [
-                'config',
-                'package.json',
-                'requirements.txt',
-                'Dockerfile',
-                'schema',
-                'migration',
-                'core/',
-                'lib/',
-                'index'
-            ]
-
-            core_count = 0
-            for file in files:
-                filename = file if isinstance(file, str) else file.get('filename', '')
-                if any(pattern in filename.lower() for pattern in core_patterns):
-                    core_count += 1
-
-            return core_count
+            return sum(
+                1 for file in files
+                if self._core_re.search(file if isinstance(file, str) else file.get('filename', ''))
+            )
         return 0
 
     def estimate_complexity(self, pr_data):